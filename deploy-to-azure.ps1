@@ -112,7 +112,7 @@ az webapp config appsettings set `
 az webapp config set `
     --name $AppName `
     --resource-group $ResourceGroup `
-    --startup-file "gunicorn --bind=0.0.0.0:8000 --timeout 600 --workers 2 app:app" `
+    --startup-file "gunicorn --bind=0.0.0.0:8000 --timeout 600 --workers 2 --worker-class gthread --threads 8 app:app" `
     --output table
 
 Write-Host "[OK] App settings configured" -ForegroundColor Green
@@ -139,7 +139,7 @@ if (Test-Path $ZipPath) {
 }
 
 # Compress files
-Compress-Archive -Path * -DestinationPath $ZipPath -Force -Exclude @("*.git*", "*__pycache__*", "*.pkl", "deploy.zip")
+Compress-Archive -Path * -DestinationPath $ZipPath -Force -Exclude @("*.git*", "*__pycache__*", "*.pkl", "*.pkl.*", "deploy.zip")
 
 Write-Host "Deploying to Azure..."
 az webapp deployment source config-zip `
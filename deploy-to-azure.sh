@@ -131,7 +131,7 @@ az webapp config appsettings set \
 az webapp config set \
     --name $APP_NAME \
     --resource-group $RESOURCE_GROUP \
-    --startup-file "gunicorn --bind=0.0.0.0:8000 --timeout 600 --workers 2 app:app" \
+    --startup-file "gunicorn --bind=0.0.0.0:8000 --timeout 600 --workers 2 --worker-class gthread --threads 8 app:app" \
     --output table
 echo -e "${GREEN}✅ App settings configured${NC}"
 echo ""
@@ -156,7 +156,7 @@ read -p "Enter choice (1-2): " deploy_choice
 case $deploy_choice in
     1)
         echo "Creating deployment package..."
-        zip -r deploy.zip . -x "*.git*" -x "*__pycache__*" -x "*.pkl" -x "deploy.zip" > /dev/null 2>&1
+        zip -r deploy.zip . -x "*.git*" -x "*__pycache__*" -x "*.pkl" -x "*.pkl.*" -x "deploy.zip" > /dev/null 2>&1
         
         echo "Deploying..."
         az webapp deployment source config-zip \
@@ -0,0 +1,22 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """Import app with its model trained and saved in a scratch directory"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(tmp_path_factory.mktemp('model'))
+        mp.setenv('PREDICTION_WORKERS', '0')
+        mp.delenv('WEBSITE_SITE_NAME', raising=False)
+        yield importlib.import_module('app')
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,42 @@
+CAR = {
+    'brand': 'BMW', 'year': 2020, 'mileage': 25000, 'fuelType': 'Petrol',
+    'transmission': 'Automatic', 'engineSize': 3.0, 'horsepower': 300,
+    'bodyType': 'Sedan', 'doors': 4, 'previousOwners': 1
+}
+OTHER_CAR = {
+    'brand': 'Ford', 'year': 2015, 'mileage': 80000, 'fuelType': 'Diesel',
+    'transmission': 'Manual', 'engineSize': 1.6, 'horsepower': 110,
+    'bodyType': 'Hatchback', 'doors': 5, 'previousOwners': 2
+}
+
+
+def test_batch_matches_single_predictions(client):
+    response = client.post('/api/predict-batch', json=[CAR, OTHER_CAR])
+    
+    assert response.status_code == 200
+    batch = [p['price'] for p in response.json['predictions']]
+    single = [
+        client.post('/api/predict', json=car).json['prediction']['price']
+        for car in (CAR, OTHER_CAR)
+    ]
+    assert batch == single
+
+
+def test_batch_rejects_missing_fields(client):
+    response = client.post('/api/predict-batch', json=[CAR, {'brand': 'BMW'}])
+    
+    assert response.status_code == 400
+    assert response.json['error'].startswith('Item 1: missing fields')
+
+
+def test_batch_rejects_oversized_request(client, app_module):
+    response = client.post('/api/predict-batch', json=[CAR] * (app_module.MAX_BATCH_SIZE + 1))
+    
+    assert response.status_code == 400
+
+
+def test_non_finite_features_are_invalid_input(client, app_module):
+    next_year = app_module.current_year() + 1
+    for car in (dict(CAR, engineSize=0), dict(CAR, year=next_year)):
+        assert client.post('/api/predict', json=car).status_code == 400
+        assert client.post('/api/predict-batch', json=[CAR, car]).status_code == 400
@@ -0,0 +1,32 @@
+import numpy as np
+
+
+def held_out_cars(model, X_test):
+    """Turn encoded held-out rows back into request-style car dicts"""
+    cars = X_test.drop(columns=['car_age', 'mileage_per_year', 'power_to_weight'])
+    cars = cars.to_dict('records')
+    for car in cars:
+        for col, levels in model.categories.items():
+            car[col] = levels[int(car[col])]
+    return cars
+
+
+def test_predict_batch_matches_training_path(app_module):
+    model = app_module.ml_model
+    _, X_test, _, _ = app_module.CarPriceMLModel().training_split()
+    
+    # Training scales the float32 frame; serving rebuilds it from dicts
+    x = model._scale_features(X_test.to_numpy(dtype=np.float32))
+    expected = model.model.predict(x)
+    served = [p['price'] for p in model.predict_batch(held_out_cars(model, X_test))]
+    
+    np.testing.assert_allclose(served, expected, rtol=0, atol=1.0)
+
+
+def test_engineered_features_match_training(app_module):
+    model = app_module.ml_model
+    _, X_test, _, _ = app_module.CarPriceMLModel().training_split()
+    
+    x = model._feature_matrix(held_out_cars(model, X_test))
+    
+    np.testing.assert_array_equal(x, X_test.to_numpy(dtype=np.float32))